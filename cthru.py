@@ -11,16 +11,48 @@ Usage:
 """
 
 import argparse
+import base64
 import csv
+import functools
+import gzip
+import http.client
+import importlib.util
 import json
+import operator
 import os
+import re
 import sys
+import time
 import urllib.parse
-import urllib.request
+from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
 # API Configuration
-API_BASE = "https://cthru.data.socrata.com/resource"
+API_HOST = "cthru.data.socrata.com"
+API_BASE = f"https://{API_HOST}/resource"
+RESOURCE_PATH = urllib.parse.urlsplit(API_BASE).path
+
+# Dataset metadata is cached on disk since column schemas rarely change
+CACHE_DIR = Path.home() / ".cache" / "cthru"
+METADATA_TTL = 24 * 60 * 60  # seconds
+
+# Maximum rows requested per call; larger limits are split into pages
+PAGE_SIZE = 1000
 
 DATASETS = {
     "spending": {
@@ -79,7 +111,144 @@ DATASETS = {
     },
 }
 
+# SoQL where-clause templates per dataset, keyed by argument name
+_FILTERS = {
+    "spending": {
+        "year": "budget_fiscal_year = '{v}'",
+        "dept": "upper(department) like upper('%{v}%')",
+        "vendor": "upper(vendor) like upper('%{v}%')",
+        "fund": "upper(fund) like upper('%{v}%')",  # Fund name, not appropriation code
+        "min_amount": "amount >= {v}",
+        "max_amount": "amount <= {v}",
+    },
+    "payroll": {
+        "year": "year = {v}",
+        "dept": "upper(department_division) like upper('%{v}%')",
+        "min_amount": "pay_total_actual >= {v}",
+        "max_amount": "pay_total_actual <= {v}",
+        "name": "(upper(name_first) like upper('%{v}%') OR upper(name_last) like upper('%{v}%'))",
+    },
+}
+
+# Runs of non-word characters, replaced with "_" in --save-json filenames
+_SANITIZE = re.compile(r"\W+")
+
+# Fastest installed JSON parser, picked once at startup. These libraries do
+# their own SIMD instruction set dispatch, and all accept bytes directly.
+if orjson is not None:
+    _json_loads = orjson.loads
+elif simdjson is not None:
+    _json_loads = simdjson.loads
+elif ujson is not None:
+    _json_loads = ujson.loads
+else:
+    _json_loads = json.loads
+
+# Columns shown in table output; None shows the first 8 fields
+_DEFAULT_COLS = {
+    "spending": ["vendor", "department", "amount", "date", "budget_fiscal_year", "object_class"],
+    "payroll": ["name_first", "name_last", "department_division", "position_title", "pay_total_actual", "year"],
+    "settlements": None,
+    "revenue": None,
+}
+
+# Reused across calls; pysimdjson parsers keep their buffers between documents
+_SIMDJSON_PARSER = simdjson.Parser() if simdjson is not None else None
+
+# Keep-alive connection to API_HOST, created on first request
+_CONN = None
 
+
+def _json_encode(obj, indent=True):
+    """Serialize obj as JSON bytes with the fastest installed encoder.
+    
+    indent=False produces compact output with no whitespace.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if ujson is not None:
+        return ujson.dumps(obj, indent=2 if indent else 0, escape_forward_slashes=False).encode()
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _json_write(obj, path):
+    """Write obj to path as indented JSON.
+    
+    The stdlib fallback streams chunks to the file instead of building the
+    whole string first.
+    """
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    elif ujson is not None:
+        with open(path, "w") as f:
+            ujson.dump(obj, f, indent=2, escape_forward_slashes=False)
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2)
+
+
+def _parse_columns(data, columns):
+    """Parse a JSON array of rows, materializing only the given columns.
+
+    Requires pysimdjson; all other fields stay unparsed in the lazy document.
+    """
+    rows = _SIMDJSON_PARSER.parse(data)
+    return [{col: row[col] for col in columns if col in row} for row in rows]
+
+
+def _get_connection():
+    """Return the shared HTTPS connection to the API host."""
+    global _CONN
+    if _CONN is None:
+        # Only needed for proxy settings, so keep it off the import path
+        import urllib.request
+        
+        proxy = urllib.request.getproxies().get("https")
+        if proxy and not urllib.request.proxy_bypass(API_HOST):
+            # Tunnel through the proxy from HTTPS_PROXY, as urllib would
+            parts = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            tunnel_headers = {}
+            if parts.username:
+                credentials = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+                tunnel_headers["Proxy-Authorization"] = f"Basic {base64.b64encode(credentials.encode()).decode()}"
+            _CONN = http.client.HTTPSConnection(parts.hostname, parts.port or 80, timeout=30)
+            _CONN.set_tunnel(API_HOST, 443, headers=tunnel_headers)
+        else:
+            _CONN = http.client.HTTPSConnection(API_HOST, timeout=30)
+    return _CONN
+
+
+def _http_get(path, headers):
+    """GET path from the API host over the shared connection.
+    
+    Returns the response and its body, decompressed if the server gzipped
+    it. Reconnects once if the server has dropped the idle keep-alive
+    connection.
+    """
+    headers = {**headers, "Accept-Encoding": "gzip"}
+    conn = _get_connection()
+    try:
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+        body = response.read()
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return response, body
+    except (OSError, http.client.HTTPException):
+        # Leave the connection clean for the next request
+        conn.close()
+        raise
+
+
+@functools.lru_cache()
 def load_credentials():
     """Load API credentials from cthru_api file."""
     script_dir = Path(__file__).parent
@@ -88,20 +257,30 @@ def load_credentials():
     if not token_file.exists():
         return None, None
     
-    app_token = None
-    secret = None
+    creds = {}
     
     try:
-        content = token_file.read_text()
-        for line in content.strip().split("\n"):
-            if line.startswith("ID:"):
-                app_token = line.split(":", 1)[1].strip()
-            elif line.startswith("secret:"):
-                secret = line.split(":", 1)[1].strip()
+        for line in token_file.read_text().splitlines():
+            key, sep, value = line.partition(":")
+            if sep:
+                creds[key.strip()] = value.strip()
     except Exception:
         pass
     
-    return app_token, secret
+    return creds.get("ID"), creds.get("secret")
+
+
+@functools.lru_cache()
+def _auth_headers(app_token, secret):
+    """Build the authentication headers for a set of credentials."""
+    # Use HTTP Basic Auth if we have both app_token and secret
+    if app_token and secret:
+        credentials = f"{app_token}:{secret}"
+        encoded = base64.b64encode(credentials.encode()).decode()
+        return {"Authorization": f"Basic {encoded}"}
+    if app_token:
+        return {"X-App-Token": app_token}
+    return {}
 
 
 def build_query(args, dataset_key):
@@ -114,51 +293,16 @@ def build_query(args, dataset_key):
     if args.offset:
         params["$offset"] = str(args.offset)
     
-    # Year filter
-    if args.year:
-        if dataset_key == "spending":
-            where_clauses.append(f"budget_fiscal_year = '{args.year}'")
-        elif dataset_key == "payroll":
-            where_clauses.append(f"year = {args.year}")
-    
-    # Department filter
-    if args.dept:
-        if dataset_key == "spending":
-            where_clauses.append(f"upper(department) like upper('%{args.dept}%')")
-        elif dataset_key == "payroll":
-            where_clauses.append(f"upper(department_division) like upper('%{args.dept}%')")
-    
-    # Vendor filter (spending only)
-    if hasattr(args, 'vendor') and args.vendor:
-        where_clauses.append(f"upper(vendor) like upper('%{args.vendor}%')")
-    
-    # Fund filter (spending only) - uses fund name for reliability
-    if hasattr(args, 'fund') and args.fund:
-        where_clauses.append(f"upper(fund) like upper('%{args.fund}%')")
-    
-    # Amount filters
-    if hasattr(args, 'min_amount') and args.min_amount is not None:
-        if dataset_key == "spending":
-            where_clauses.append(f"amount >= {args.min_amount}")
-        elif dataset_key == "payroll":
-            where_clauses.append(f"pay_total_actual >= {args.min_amount}")
-    
-    if hasattr(args, 'max_amount') and args.max_amount is not None:
-        if dataset_key == "spending":
-            where_clauses.append(f"amount <= {args.max_amount}")
-        elif dataset_key == "payroll":
-            where_clauses.append(f"pay_total_actual <= {args.max_amount}")
-    
-    # Name filter (payroll only)
-    if hasattr(args, 'name') and args.name:
-        where_clauses.append(f"(upper(name_first) like upper('%{args.name}%') OR upper(name_last) like upper('%{args.name}%'))")
-    
-    # Search filter (generic text search)
+    # Field filters; single quotes are doubled to escape SoQL string literals
+    for attr, template in _FILTERS.get(dataset_key, {}).items():
+        value = getattr(args, attr)
+        if value is None or value == "":
+            continue
+        where_clauses.append(template.format(v=str(value).replace("'", "''")))
+    
+    # Search filter uses Socrata's full-text index
     if args.search:
-        if dataset_key == "spending":
-            where_clauses.append(f"(upper(vendor) like upper('%{args.search}%') OR upper(department) like upper('%{args.search}%'))")
-        elif dataset_key == "payroll":
-            where_clauses.append(f"(upper(name_first) like upper('%{args.search}%') OR upper(name_last) like upper('%{args.search}%') OR upper(department_division) like upper('%{args.search}%'))")
+        params["$q"] = args.search
     
     # Combine where clauses
     if where_clauses:
@@ -171,17 +315,101 @@ def build_query(args, dataset_key):
     return params
 
 
-def generate_socrata_url(dataset_id, params):
+def _page_params(params, limit):
+    """Split a query with a large $limit into PAGE_SIZE windows."""
+    base = {k: v for k, v in params.items() if k not in ("$limit", "$offset")}
+    # Paging needs a stable order; :id is Socrata's unique row identifier and
+    # breaks ties when the user's sort key is not unique
+    order = base.get("$order")
+    base["$order"] = f"{order},:id" if order else ":id"
+    start = int(params.get("$offset", 0))
+    
+    windows = []
+    for offset in range(0, limit, PAGE_SIZE):
+        page = dict(base)
+        page["$limit"] = str(min(PAGE_SIZE, limit - offset))
+        page["$offset"] = str(start + offset)
+        windows.append(page)
+    return windows
+
+
+def _check_response(status, reason, body):
+    """Report an HTTP error response and exit."""
+    # http.client does not follow redirects, so anything but 2xx is an error
+    if 200 <= status < 300:
+        return
+    print(f"Error: HTTP {status} - {reason}", file=sys.stderr)
+    if body:
+        error_body = body.decode(errors="replace")
+        try:
+            error_json = json.loads(body)
+            print(f"  {error_json.get('message', error_body)}", file=sys.stderr)
+        except ValueError:
+            print(f"  {error_body[:200]}", file=sys.stderr)
+    sys.exit(1)
+
+
+def _fetch_body(path, headers):
+    """Fetch one response body over the shared connection, exiting on errors."""
+    try:
+        response, body = _http_get(path, headers)
+    except (OSError, http.client.HTTPException) as e:
+        print(f"Error: Connection failed - {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    _check_response(response.status, response.reason, body)
+    return body
+
+
+def _fetch_pages(paths, headers, concurrency):
+    """Fetch several response bodies concurrently with httpx, exiting on errors.
+    
+    At most concurrency requests are in flight at once.
+    """
+    # asyncio and httpx are slow to import, so load them only for paging
+    import asyncio
+    import httpx
+    
+    # httpx only speaks HTTP/2 when the h2 package is installed
+    http2 = importlib.util.find_spec("h2") is not None
+    
+    async def fetch_all():
+        # The semaphore caps in-flight requests even when HTTP/2 multiplexes
+        # them over one connection; nothing waits in the pool, so no pool timeout
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency)
+        timeout = httpx.Timeout(30, pool=None)
+        async with httpx.AsyncClient(base_url=f"https://{API_HOST}", headers=headers,
+                                     http2=http2, limits=limits, timeout=timeout) as client:
+            async def get(path):
+                async with semaphore:
+                    return await client.get(path)
+            
+            return await asyncio.gather(*(get(p) for p in paths))
+    
+    try:
+        responses = asyncio.run(fetch_all())
+    except httpx.HTTPError as e:
+        print(f"Error: Connection failed - {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    for response in responses:
+        _check_response(response.status_code, response.reason_phrase, response.content)
+    return [response.content for response in responses]
+
+
+def view_query_string(params):
+    """Encode query params for browser links, without $limit for full results."""
+    return urllib.parse.urlencode({k: v for k, v in params.items() if k != "$limit"})
+
+
+def generate_socrata_url(dataset_id, query_string=None):
     """Generate a Socrata portal URL for viewing the same query in a browser."""
     # Direct API URL returns JSON - viewable in browser
     api_url = f"https://cthru.data.socrata.com/resource/{dataset_id}.json"
     
-    if params:
-        # Build query string, but remove limit for full results
-        url_params = {k: v for k, v in params.items() if k != "$limit"}
-        if url_params:
-            query_string = urllib.parse.urlencode(url_params)
-            api_url = f"{api_url}?{query_string}"
+    if query_string:
+        api_url = f"{api_url}?{query_string}"
     
     # Also provide the portal link
     portal_url = f"https://cthru.data.socrata.com/d/{dataset_id}"
@@ -189,62 +417,75 @@ def generate_socrata_url(dataset_id, params):
     return f"{api_url}\n               Portal: {portal_url}"
 
 
-def fetch_data(dataset_id, params, app_token=None, secret=None):
-    """Fetch data from the Socrata API."""
-    import base64
+def fetch_data(dataset_id, params, app_token=None, secret=None, columns=None, pages=4):
+    """Fetch data from the Socrata API.
     
-    url = f"{API_BASE}/{dataset_id}.json"
+    Limits above PAGE_SIZE are fetched as separate pages, up to pages at a
+    time when httpx is installed. If columns is given and pysimdjson is
+    installed, only those fields are kept in each returned row.
+    """
+    path = f"{RESOURCE_PATH}/{dataset_id}.json"
+    headers = {"Accept": "application/json", **_auth_headers(app_token, secret)}
     
-    if params:
-        query_string = urllib.parse.urlencode(params)
-        url = f"{url}?{query_string}"
-    
-    headers = {"Accept": "application/json"}
+    limit = int(params.get("$limit", 0)) if params else 0
+    if limit > PAGE_SIZE:
+        page_paths = [f"{path}?{urllib.parse.urlencode(p)}" for p in _page_params(params, limit)]
+        if importlib.util.find_spec("httpx") is not None:
+            bodies = _fetch_pages(page_paths, headers, pages)
+        else:
+            bodies = [_fetch_body(p, headers) for p in page_paths]
+    else:
+        if params:
+            path = f"{path}?{urllib.parse.urlencode(params)}"
+        bodies = [_fetch_body(path, headers)]
     
-    # Use HTTP Basic Auth if we have both app_token and secret
-    if app_token and secret:
-        credentials = f"{app_token}:{secret}"
-        encoded = base64.b64encode(credentials.encode()).decode()
-        headers["Authorization"] = f"Basic {encoded}"
-    elif app_token:
-        headers["X-App-Token"] = app_token
+    data = []
+    for body in bodies:
+        if columns and _SIMDJSON_PARSER is not None:
+            data.extend(_parse_columns(body, columns))
+        else:
+            data.extend(_json_loads(body))
+    return data
+
+
+def fetch_metadata(dataset_id, app_token=None, use_cache=True, refresh=False):
+    """Fetch dataset metadata to get column information.
     
-    request = urllib.request.Request(url, headers=headers)
+    Responses are cached in CACHE_DIR for METADATA_TTL seconds. refresh
+    ignores the cached copy; use_cache=False skips the cache entirely.
+    """
+    cache_path = CACHE_DIR / f"{dataset_id}.json"
     
-    try:
-        with urllib.request.urlopen(request, timeout=30) as response:
-            return json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"Error: HTTP {e.code} - {e.reason}", file=sys.stderr)
-        if error_body:
+    if use_cache and not refresh and cache_path.exists():
+        if time.time() - cache_path.stat().st_mtime < METADATA_TTL:
             try:
-                error_json = json.loads(error_body)
-                print(f"  {error_json.get('message', error_body)}", file=sys.stderr)
-            except json.JSONDecodeError:
-                print(f"  {error_body[:200]}", file=sys.stderr)
-        sys.exit(1)
-    except urllib.error.URLError as e:
-        print(f"Error: Connection failed - {e.reason}", file=sys.stderr)
-        sys.exit(1)
-
-
-def fetch_metadata(dataset_id, app_token=None):
-    """Fetch dataset metadata to get column information."""
-    url = f"https://cthru.data.socrata.com/api/views/{dataset_id}.json"
+                return _json_loads(cache_path.read_bytes())
+            except ValueError:
+                pass  # Corrupt cache file, fetch again
+    
+    path = f"/api/views/{dataset_id}.json"
     
     headers = {"Accept": "application/json"}
     if app_token:
         headers["X-App-Token"] = app_token
     
-    request = urllib.request.Request(url, headers=headers)
-    
     try:
-        with urllib.request.urlopen(request, timeout=30) as response:
-            return json.loads(response.read().decode())
+        response, body = _http_get(path, headers)
+        if not 200 <= response.status < 300:
+            raise http.client.HTTPException(f"HTTP {response.status} - {response.reason}")
+        metadata = _json_loads(body)
     except Exception as e:
         print(f"Error fetching metadata: {e}", file=sys.stderr)
         return None
+    
+    if use_cache:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(body)
+        except OSError:
+            pass  # Caching is best-effort
+    
+    return metadata
 
 
 def format_table(data, columns=None):
@@ -258,84 +499,68 @@ def format_table(data, columns=None):
     else:
         cols = list(data[0].keys())[:8]  # Limit to 8 columns for readability
     
-    # Calculate column widths
-    widths = {}
-    for col in cols:
-        max_len = len(col)
-        for row in data[:50]:  # Sample first 50 rows
-            val = str(row.get(col, ""))[:40]  # Truncate long values
-            max_len = max(max_len, len(val))
-        widths[col] = min(max_len, 40)
+    # Stringify each column once; map() keeps the per-cell work in C
+    getters = [operator.methodcaller("get", col, "") for col in cols]
+    col_values = [list(map(str, map(getter, data))) for getter in getters]
     
-    # Build header
-    header = " | ".join(col.ljust(widths[col])[:widths[col]] for col in cols)
-    separator = "-+-".join("-" * widths[col] for col in cols)
+    # Calculate column widths from the first 50 rows, truncating long values
+    widths = [min(max(len(col), max(map(len, values[:50]))), 40) for col, values in zip(cols, col_values)]
     
-    lines = [header, separator]
+    # Build header
+    header = " | ".join(col.ljust(w)[:w] for col, w in zip(cols, widths))
+    separator = "-+-".join("-" * w for w in widths)
     
     # Build rows
-    for row in data:
-        cells = []
-        for col in cols:
-            val = str(row.get(col, ""))[:widths[col]]
-            cells.append(val.ljust(widths[col]))
-        lines.append(" | ".join(cells))
+    cells = zip(*col_values) if cols else [()] * len(data)
+    rows = [" | ".join(val[:w].ljust(w) for val, w in zip(r, widths)) for r in cells]
     
-    return "\n".join(lines)
+    return "\n".join([header, separator] + rows)
 
 
-def format_csv(data):
-    """Format data as CSV."""
+def write_csv(data, f):
+    """Write data as CSV to a file object."""
     if not data:
-        return ""
+        return
     
-    output = []
     cols = list(data[0].keys())
-    output.append(",".join(cols))
-    
-    for row in data:
-        values = []
-        for col in cols:
-            val = str(row.get(col, "")).replace('"', '""')
-            if "," in val or '"' in val or "\n" in val:
-                val = f'"{val}"'
-            values.append(val)
-        output.append(",".join(values))
-    
-    return "\n".join(output)
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(cols)
+    getters = [operator.methodcaller("get", col, "") for col in cols]
+    writer.writerows(zip(*(map(getter, data) for getter in getters)))
 
 
-def output_results(data, args, default_columns=None, url=None, dataset_id=None, params=None):
-    """Output results in the specified format."""
+def output_results(data, args, default_columns=None, url=None, dataset_id=None, query_string=None):
+    """Output results in the specified format.
+    
+    query_string is the encoded query from view_query_string, used for the
+    --save-json source URL.
+    """
     if not data:
         print("No results found.")
         return
     
     # Handle --save-json flag: save JSON and display table
-    if hasattr(args, 'save_json') and args.save_json:
-        import re
-        from datetime import datetime
-        
+    if args.save_json:
         # Build filename parts from query filters
         parts = [args.command]
         
-        if hasattr(args, 'year') and args.year:
+        if args.year:
             parts.append(f"fy{args.year}")
-        if hasattr(args, 'vendor') and args.vendor:
+        if args.vendor:
             # Sanitize vendor name for filename
-            vendor_clean = re.sub(r'[^\w]', '_', args.vendor)[:20].strip('_')
+            vendor_clean = _SANITIZE.sub("_", args.vendor)[:20].strip('_')
             parts.append(vendor_clean)
-        if hasattr(args, 'fund') and args.fund:
-            fund_clean = re.sub(r'[^\w]', '_', args.fund)[:20].strip('_')
+        if args.fund:
+            fund_clean = _SANITIZE.sub("_", args.fund)[:20].strip('_')
             parts.append(fund_clean)
-        if hasattr(args, 'dept') and args.dept:
-            dept_clean = re.sub(r'[^\w]', '_', args.dept)[:20].strip('_')
+        if args.dept:
+            dept_clean = _SANITIZE.sub("_", args.dept)[:20].strip('_')
             parts.append(dept_clean)
-        if hasattr(args, 'name') and args.name:
-            name_clean = re.sub(r'[^\w]', '_', args.name)[:20].strip('_')
+        if args.name:
+            name_clean = _SANITIZE.sub("_", args.name)[:20].strip('_')
             parts.append(name_clean)
-        if hasattr(args, 'search') and args.search:
-            search_clean = re.sub(r'[^\w]', '_', args.search)[:20].strip('_')
+        if args.search:
+            search_clean = _SANITIZE.sub("_", args.search)[:20].strip('_')
             parts.append(search_clean)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -345,10 +570,8 @@ def output_results(data, args, default_columns=None, url=None, dataset_id=None,
         
         # Build metadata wrapper with URLs
         api_url = f"https://cthru.data.socrata.com/resource/{dataset_id}.json"
-        if params:
-            url_params = {k: v for k, v in params.items() if k != "$limit"}
-            if url_params:
-                api_url = f"{api_url}?{urllib.parse.urlencode(url_params)}"
+        if query_string:
+            api_url = f"{api_url}?{query_string}"
         
         portal_url = f"https://cthru.data.socrata.com/d/{dataset_id}" if dataset_id else None
         
@@ -360,76 +583,52 @@ def output_results(data, args, default_columns=None, url=None, dataset_id=None,
             "data": data
         }
         
-        Path(json_file).write_text(json.dumps(wrapped_data, indent=2))
+        _json_write(wrapped_data, json_file)
         print(f"JSON saved to {json_file}")
     
-    if args.format == "json":
-        output = json.dumps(data, indent=2)
-    elif args.format == "csv":
-        output = format_csv(data)
-    else:  # table
-        output = format_table(data, default_columns)
+    if args.format == "csv":
+        # Stream rows straight to the destination
+        if args.output:
+            with open(args.output, "w", newline="") as f:
+                write_csv(data, f)
+        else:
+            write_csv(data, sys.stdout)
+    else:
+        if args.format == "json":
+            # Pretty-print only for a terminal; files and pipes get compact JSON
+            indent = not args.output and sys.stdout.isatty()
+            output = _json_encode(data, indent).decode()
+        else:  # table
+            output = format_table(data, default_columns)
+        
+        if args.output:
+            Path(args.output).write_text(output)
+        else:
+            print(output)
     
     if args.output:
-        Path(args.output).write_text(output)
         print(f"Results saved to {args.output} ({len(data)} records)")
     else:
-        print(output)
         print(f"\n--- {len(data)} records ---")
     
     # Show URL if requested
-    if hasattr(args, 'url') and args.url and url:
+    if args.url and url:
         print(f"\nView in browser: {url}")
 
 
-def cmd_spending(args):
-    """Query spending data."""
-    app_token, secret = load_credentials()
-    params = build_query(args, "spending")
-    dataset_id = DATASETS["spending"]["id"]
-    data = fetch_data(dataset_id, params, app_token, secret)
-    
-    url = generate_socrata_url(dataset_id, params) if hasattr(args, 'url') and args.url else None
-    default_cols = ["vendor", "department", "amount", "date", "budget_fiscal_year", "object_class"]
-    output_results(data, args, default_cols, url, dataset_id, params)
-
-
-def cmd_payroll(args):
-    """Query payroll data."""
-    app_token, secret = load_credentials()
-    params = build_query(args, "payroll")
-    dataset_id = DATASETS["payroll"]["id"]
-    data = fetch_data(dataset_id, params, app_token, secret)
-    
-    url = generate_socrata_url(dataset_id, params) if hasattr(args, 'url') and args.url else None
-    default_cols = ["name_first", "name_last", "department_division", "position_title", "pay_total_actual", "year"]
-    output_results(data, args, default_cols, url, dataset_id, params)
-
-
-def cmd_settlements(args):
-    """Query settlements data."""
-    app_token, secret = load_credentials()
-    params = {"$limit": str(args.limit)}
-    if args.offset:
-        params["$offset"] = str(args.offset)
-    if args.search:
-        params["$q"] = args.search
-    
-    data = fetch_data(DATASETS["settlements"]["id"], params, app_token, secret)
-    output_results(data, args)
-
-
-def cmd_revenue(args):
-    """Query revenue data."""
+def run_query(dataset_key, args):
+    """Query a dataset and output the results."""
     app_token, secret = load_credentials()
-    params = {"$limit": str(args.limit)}
-    if args.offset:
-        params["$offset"] = str(args.offset)
-    if args.search:
-        params["$q"] = args.search
+    params = build_query(args, dataset_key)
+    dataset_id = DATASETS[dataset_key]["id"]
+    default_cols = _DEFAULT_COLS[dataset_key]
+    # The table only shows default_cols, so other fields need not be parsed
+    columns = default_cols if args.format == "table" and not args.save_json else None
+    data = fetch_data(dataset_id, params, app_token, secret, columns, args.pages)
     
-    data = fetch_data(DATASETS["revenue"]["id"], params, app_token, secret)
-    output_results(data, args)
+    query_string = view_query_string(params)
+    url = generate_socrata_url(dataset_id, query_string) if args.url else None
+    output_results(data, args, default_cols, url, dataset_id, query_string)
 
 
 def cmd_datasets(args):
@@ -449,7 +648,8 @@ def cmd_datasets(args):
         print(f"  Description: {ds['description']}")
         
         # Fetch column metadata
-        metadata = fetch_metadata(ds['id'], app_token)
+        metadata = fetch_metadata(ds['id'], app_token, use_cache=not args.no_cache,
+                                  refresh=args.refresh_metadata)
         if metadata and 'columns' in metadata:
             print(f"\n  Columns ({len(metadata['columns'])}):")
             for col in metadata['columns']:
@@ -469,6 +669,14 @@ def cmd_datasets(args):
         print("Use 'cthru datasets --info <name>' to see columns for a dataset.")
 
 
+def positive_int(value):
+    """argparse type for integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Query Massachusetts state financial data from CTHRU",
@@ -488,12 +696,16 @@ Examples:
     def add_common_args(p):
         p.add_argument("-n", "--limit", type=int, default=100, help="Number of records (default: 100)")
         p.add_argument("--offset", type=int, help="Starting record offset for pagination")
+        p.add_argument("--pages", type=positive_int, default=4, metavar="K",
+                       help=f"Concurrent page requests when --limit exceeds {PAGE_SIZE} (default: 4)")
         p.add_argument("-f", "--format", choices=["table", "json", "csv"], default="table", help="Output format")
         p.add_argument("-o", "--output", help="Save output to file")
         p.add_argument("-s", "--search", help="General text search")
         p.add_argument("--sort", help="Sort by field (e.g., 'amount:desc')")
         p.add_argument("--url", action="store_true", help="Show link to view data in web browser")
         p.add_argument("--save-json", action="store_true", help="Save raw JSON response to timestamped file")
+        # Filters not offered by every command default to None so they can be tested directly
+        p.set_defaults(year=None, dept=None, vendor=None, fund=None, name=None, min_amount=None, max_amount=None)
     
     # Spending command
     spending_parser = subparsers.add_parser("spending", help="Query vendor/department spending")
@@ -504,7 +716,7 @@ Examples:
     spending_parser.add_argument("--fund", help="Filter by fund name (e.g., 'opioid')")
     spending_parser.add_argument("--min-amount", type=float, help="Minimum dollar amount")
     spending_parser.add_argument("--max-amount", type=float, help="Maximum dollar amount")
-    spending_parser.set_defaults(func=cmd_spending)
+    spending_parser.set_defaults(func=functools.partial(run_query, "spending"))
     
     # Payroll command
     payroll_parser = subparsers.add_parser("payroll", help="Query state employee compensation")
@@ -514,21 +726,23 @@ Examples:
     payroll_parser.add_argument("--name", help="Filter by employee name")
     payroll_parser.add_argument("--min-amount", type=float, help="Minimum total pay")
     payroll_parser.add_argument("--max-amount", type=float, help="Maximum total pay")
-    payroll_parser.set_defaults(func=cmd_payroll)
+    payroll_parser.set_defaults(func=functools.partial(run_query, "payroll"))
     
     # Settlements command
     settlements_parser = subparsers.add_parser("settlements", help="Query legal settlements")
     add_common_args(settlements_parser)
-    settlements_parser.set_defaults(func=cmd_settlements)
+    settlements_parser.set_defaults(func=functools.partial(run_query, "settlements"))
     
     # Revenue command
     revenue_parser = subparsers.add_parser("revenue", help="Query revenue collections")
     add_common_args(revenue_parser)
-    revenue_parser.set_defaults(func=cmd_revenue)
+    revenue_parser.set_defaults(func=functools.partial(run_query, "revenue"))
     
     # Datasets command
     datasets_parser = subparsers.add_parser("datasets", help="List available datasets")
     datasets_parser.add_argument("--info", metavar="NAME", help="Show detailed info for a dataset")
+    datasets_parser.add_argument("--no-cache", action="store_true", help="Don't read or write the metadata cache")
+    datasets_parser.add_argument("--refresh-metadata", action="store_true", help="Ignore cached metadata and fetch it again")
     datasets_parser.set_defaults(func=cmd_datasets)
     
     args = parser.parse_args()